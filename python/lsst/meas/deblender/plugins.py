@@ -40,21 +40,33 @@ def clipFootprintToNonzeroImpl(foot, image):
     '''
     x0 = image.getX0()
     y0 = image.getY0()
-    xImMax = x0 + image.getDimensions().getX()
-    yImMax = y0 + image.getDimensions().getY()
-    newSpans = []
     arr = image.getArray()
-    for span in foot.spans:
-        y = span.getY()
-        if y < y0 or y > yImMax:
-            continue
-        spanX0 = span.getX0()
-        spanX1 = span.getX1()
-        xMin = spanX0 if spanX0 >= x0 else x0
-        xMax = spanX1 if spanX1 <= xImMax else xImMax
-        xarray = np.arange(xMin, xMax+1)[arr[y-y0, xMin-x0:xMax-x0+1] != 0]
-        if len(xarray) > 0:
-            newSpans.append(afwGeom.Span(y, xarray[0], xarray[-1]))
+    height, width = arr.shape
+    spans = np.array([(span.getY(), span.getX0(), span.getX1()) for span in foot.spans], dtype=int)
+    spans = spans.reshape(-1, 3)
+    # Clip the spans to the image, in array coordinates
+    rows = spans[:, 0] - y0
+    xMin = np.maximum(spans[:, 1] - x0, 0)
+    xMax = np.minimum(spans[:, 2] - x0, width - 1)
+    inImage = (rows >= 0) & (rows < height) & (xMin <= xMax)
+    rows, xMin, xMax = rows[inImage], xMin[inImage], xMax[inImage]
+    # For every pixel in the rows containing spans, find the column of the nearest
+    # non-zero pixel in the same row at or after it (nextNonzero) and at or before
+    # it (prevNonzero), so that the new endpoints of all of the spans can be looked
+    # up at once
+    spanRows, rowIndex = np.unique(rows, return_inverse=True)
+    columns = np.arange(width, dtype=np.int32)
+    nonzero = arr[spanRows] != 0
+    nextNonzero = np.minimum.accumulate(np.where(nonzero, columns, np.int32(width))[:, ::-1],
+                                        axis=1)[:, ::-1]
+    prevNonzero = np.maximum.accumulate(np.where(nonzero, columns, np.int32(-1)), axis=1)
+    first = nextNonzero[rowIndex, xMin]
+    last = prevNonzero[rowIndex, xMax]
+    # Spans that are totally zero have no non-zero pixel before their end
+    keep = first <= xMax
+    newSpans = [afwGeom.Span(y, xa, xb) for y, xa, xb in zip((rows[keep] + y0).tolist(),
+                                                             (first[keep] + x0).tolist(),
+                                                             (last[keep] + x0).tolist())]
     # Time to update the SpanSet
     foot.setSpans(afwGeom.SpanSet(newSpans, normalize=False))
     foot.removeOrphanPeaks()
@@ -145,7 +157,7 @@ def _setPeakError(debResult, log, pk, cx, cy, filters, msg, flag):
     -------
     None
     """
-    log.trace("Peak {0} at ({1},{2}):{3}".format(pk, cx, cy, msg))
+    log.trace("Peak %s at (%s,%s):%s", pk, cx, cy, msg)
     for fidx, f in enumerate(filters):
         pkResult = debResult.deblendedParents[f].peaks[pk]
         getattr(pkResult, flag)()
@@ -367,9 +379,9 @@ def _fitPsf(fp, fmask, pk, pkF, pkres, fbb, peaks, peaksF, log, psf, psffwhm,
         pkres.setNoValidPixels()
         return
 
-    # pixel coords of valid pixels
-    XX, YY = np.meshgrid(xx, yy)
-    ipixes = np.vstack((XX[valid] - xlo, YY[valid] - ylo)).T
+    # pixel coords of valid pixels (relative to xlo, ylo), in row-major order
+    iy, ix = np.nonzero(valid)
+    ipixes = np.column_stack((ix, iy))
 
     inpsfx = (xx >= px0)*(xx <= px1)
     inpsfy = (yy >= py0)*(yy <= py1)
@@ -567,11 +579,14 @@ def _fitPsf(fp, fmask, pk, pkF, pkres, fbb, peaks, peaksF, log, psf, psffwhm,
             dpx0, dpy0 = px0 - xlo, py0 - ylo
             psfsub = psfarr[sy3-dpy0:sy4-dpy0, sx3-dpx0:sx4-dpx0]
             vsub = valid[sy1-ylo:sy2-ylo, sx1-xlo:sx2-xlo]
-            xx, yy = np.arange(xlo, xhi+1), np.arange(ylo, yhi+1)
+            # the stamp is unchanged, so reuse the pixel coordinates from the first fit
             inpsf = np.outer((yy >= py0)*(yy <= py1), (xx >= px0)*(xx <= px1))
             Ab[inpsf[valid], I_psf] = psfsub[vsub]
 
-            Aw = Ab*w[:, np.newaxis]
+            # Only the PSF column has changed, so re-weight that column in place
+            # instead of re-weighting the whole matrix (Aw is not used after this point)
+            Aw = Aw[:, :NT1]
+            Aw[:, I_psf] = Ab[:, I_psf]*w
             # re-solve...
             Xb, rb, rankb, sb = np.linalg.lstsq(Aw, bw, rcond=-1)
             if len(rb) > 0:
@@ -617,15 +632,15 @@ def _fitPsf(fp, fmask, pk, pkF, pkres, fbb, peaks, peaksF, log, psf, psffwhm,
         psfderivmod.setXY0(xlo, ylo)
         model = afwImage.ImageF(SW, SH)
         model.setXY0(xlo, ylo)
-        for i in range(len(Xpsf)):
-            for (x, y), v in zip(ipixes, A[:, i]*Xpsf[i]):
-                ix, iy = int(x), int(y)
-                model.set(ix, iy, model.get(ix, iy) + float(v))
-                if i in [I_psf, I_dx, I_dy]:
-                    psfderivmod.set(ix, iy, psfderivmod.get(ix, iy) + float(v))
-        for ii in range(NP):
-            x, y = ipixes[ii, :]
-            psfmod.set(int(x), int(y), float(A[ii, I_psf]*Xpsf[I_psf]))
+        # contribution of each fit parameter to each valid pixel;
+        # the valid pixels are distinct, so they can be assigned directly
+        terms = A[:, :len(Xpsf)]*Xpsf
+        pixes = (ipixes[:, 1], ipixes[:, 0])
+        model.getArray()[pixes] = terms.sum(axis=1)
+        # the unshifted fits (X1 and Xb) have no derivative terms
+        iderivs = [i for i in [I_psf, I_dx, I_dy] if i < terms.shape[1]]
+        psfderivmod.getArray()[pixes] = terms[:, iderivs].sum(axis=1)
+        psfmod.getArray()[pixes] = terms[:, I_psf]
         modelfp = afwDet.Footprint(fp.getPeaks().getSchema())
         for (x, y) in ipixes:
             modelfp.addSpan(int(y+ylo), int(x+xlo), int(x+xlo))
@@ -713,7 +728,7 @@ def buildSymmetricTemplates(debResult, log, patchEdges=False, setOrigTemplate=Tr
     # Create the Templates for each peak in each filter
     for fidx in debResult.filters:
         dp = debResult.deblendedParents[fidx]
-        imbb = dp.img.getBBox()
+        imbb = dp.imbb
         log.trace('Creating templates for footprint at x0,y0,W,H = %i, %i, %i, %i)', dp.x0, dp.y0, dp.W, dp.H)
 
         for peaki, pkres in enumerate(dp.peaks):
@@ -775,6 +790,8 @@ def rampFluxAtEdge(debResult, log, patchEdges=False):
     for fidx in debResult.filters:
         dp = debResult.deblendedParents[fidx]
         log.trace('Checking for significant flux at edge: sigma1=%g', dp.avgNoise)
+        # The ramp PSF only depends on the parent, so it is shared by all of its peaks
+        rampPsf = None
 
         for peaki, pkres in enumerate(dp.peaks):
             if pkres.skip or pkres.deblendedAsPsf:
@@ -783,10 +800,12 @@ def rampFluxAtEdge(debResult, log, patchEdges=False):
             if bUtils.hasSignificantFluxAtEdge(timg, tfoot, 3*dp.avgNoise):
                 log.trace("Template %i has significant flux at edge: ramping", pkres.pki)
                 try:
+                    if rampPsf is None:
+                        rampPsf = _getRampPsf(dp.psf, dp.psffwhm, dp.x0, dp.x1, dp.y0, dp.y1)
                     (timg2, tfoot2, patched) = _handle_flux_at_edge(log, dp.psffwhm, timg, tfoot, dp.fp,
                                                                     dp.maskedImage, dp.x0, dp.x1,
                                                                     dp.y0, dp.y1, dp.psf, pkres.peak,
-                                                                    dp.avgNoise, patchEdges)
+                                                                    dp.avgNoise, patchEdges, rampPsf)
                 except lsst.pex.exceptions.Exception as exc:
                     if (isinstance(exc, lsst.pex.exceptions.InvalidParameterError)
                             and "CoaddPsf" in str(exc)):
@@ -801,8 +820,60 @@ def rampFluxAtEdge(debResult, log, patchEdges=False):
     return modified
 
 
+def _getRampSize(psffwhm):
+    """Size (in pixels) to grow a template by when ramping flux at its edge
+
+    This is ``1.5*psffwhm``, rounded to an odd integer.
+    """
+    S = psffwhm*1.5
+    # make it an odd integer
+    return int((S + 0.5)/2)*2 + 1
+
+
+def _getRampPsf(psf, psffwhm, x0, x1, y0, y1):
+    """Build the PSF image used to ramp down template flux at the edge of a footprint.
+
+    The PSF is evaluated at the center of the parent footprint, so the same image
+    can be used for all of the peaks in the parent.
+
+    Parameters
+    ----------
+    psf: `afw.detection.Psf`
+        PSF of the image.
+    psffwhm: `float`
+        PSF FWHM in pixels.
+    x0,y0: `int`
+        Minimum x,y for the bounding box of the parent footprint.
+    x1,y1: `int`
+        Maximum x,y for the bounding box of the parent footprint.
+
+    Returns
+    -------
+    psfim: `afw.image.ImageD`
+        PSF image centered on zero, clipped to the ramp size and
+        normalized to a maximum of one.
+    """
+    S = _getRampSize(psffwhm)
+    xc = int((x0 + x1)/2)
+    yc = int((y0 + y1)/2)
+    psfim = psf.computeImage(geom.Point2D(xc, yc))
+    pbb = psfim.getBBox()
+    # shift PSF image to be centered on zero
+    lx, ly = pbb.getMinX(), pbb.getMinY()
+    psfim.setXY0(lx - xc, ly - yc)
+    pbb = psfim.getBBox()
+    # clip PSF to S, if necessary
+    Sbox = geom.Box2I(geom.Point2I(-S, -S), geom.Extent2I(2*S+1, 2*S+1))
+    if not Sbox.contains(pbb):
+        # clip PSF image
+        psfim = psfim.Factory(psfim, Sbox, afwImage.PARENT, True)
+    P = psfim.getArray()
+    P /= P.max()
+    return psfim
+
+
 def _handle_flux_at_edge(log, psffwhm, t1, tfoot, fp, maskedImage,
-                         x0, x1, y0, y1, psf, pk, sigma1, patchEdges):
+                         x0, x1, y0, y1, psf, pk, sigma1, patchEdges, rampPsf=None):
     """Extend a template by the PSF to fill in the footprint.
 
     Using the PSF, a footprint that touches the edge is passed to the function
@@ -837,6 +908,9 @@ def _handle_flux_at_edge(log, psffwhm, t1, tfoot, fp, maskedImage,
         ``EDGE`` bit set, then for spans whose symmetric mirror are outside the
         image, the symmetric footprint is grown to include them and their
         pixel values are stored.
+    rampPsf: `afw.image.ImageD`, optional
+        Normalized PSF image used to ramp the edge pixels, as returned by
+        `_getRampPsf`. The default is ``None``, which builds it from ``psf``.
 
     Results
     -------
@@ -856,9 +930,7 @@ def _handle_flux_at_edge(log, psffwhm, t1, tfoot, fp, maskedImage,
     # Then find the symmetric template of that image.
 
     # The size we'll grow by
-    S = psffwhm*1.5
-    # make it an odd integer
-    S = int((S + 0.5)/2)*2 + 1
+    S = _getRampSize(psffwhm)
 
     tbb = tfoot.getBBox()
     tbb.grow(S)
@@ -876,20 +948,9 @@ def _handle_flux_at_edge(log, psffwhm, t1, tfoot, fp, maskedImage,
     edgepix = bUtils.getSignificantEdgePixels(t1, tfoot, -1e6)
 
     # instantiate PSF image
-    xc = int((x0 + x1)/2)
-    yc = int((y0 + y1)/2)
-    psfim = psf.computeImage(geom.Point2D(xc, yc))
-    pbb = psfim.getBBox()
-    # shift PSF image to be centered on zero
-    lx, ly = pbb.getMinX(), pbb.getMinY()
-    psfim.setXY0(lx - xc, ly - yc)
-    pbb = psfim.getBBox()
-    # clip PSF to S, if necessary
-    Sbox = geom.Box2I(geom.Point2I(-S, -S), geom.Extent2I(2*S+1, 2*S+1))
-    if not Sbox.contains(pbb):
-        # clip PSF image
-        psfim = psfim.Factory(psfim, Sbox, afwImage.PARENT, True)
-        pbb = psfim.getBBox()
+    if rampPsf is None:
+        rampPsf = _getRampPsf(psf, psffwhm, x0, x1, y0, y1)
+    pbb = rampPsf.getBBox()
     px0 = pbb.getMinX()
     px1 = pbb.getMaxX()
     py0 = pbb.getMinY()
@@ -901,8 +962,7 @@ def _handle_flux_at_edge(log, psffwhm, t1, tfoot, fp, maskedImage,
     Tin = t1.getArray()
     tx0, ty0 = t1.getX0(), t1.getY0()
     ox0, oy0 = ramped.getX0(), ramped.getY0()
-    P = psfim.getArray()
-    P /= P.max()
+    P = rampPsf.getArray()
     # For each edge pixel, Tout = max(Tout, edgepix * PSF)
     for span in edgepix.getSpans():
         y = span.getY()
@@ -913,8 +973,8 @@ def _handle_flux_at_edge(log, psffwhm, t1, tfoot, fp, maskedImage,
 
     # Fill in the "padim" (which has the right variance and
     # mask planes) with the ramped pixels, outside the footprint
-    imZeros = (padim.getImage().getArray() == 0)
-    padim.getImage().getArray()[imZeros] = ramped.getArray()[imZeros]
+    padarr = padim.getImage().getArray()
+    np.copyto(padarr, ramped.getArray(), where=(padarr == 0))
 
     t2, tfoot2, patched = bUtils.buildSymmetricTemplate(padim, fpcopy, pk, sigma1, True, patchEdges)
 
@@ -1038,8 +1098,9 @@ def clipFootprintsToNonzero(debResult, log):
                 continue
             timg, tfoot = pkres.templateImage, pkres.templateFootprint
             clipFootprintToNonzeroImpl(tfoot, timg)
-            if not tfoot.getBBox().isEmpty() and tfoot.getBBox() != timg.getBBox(afwImage.PARENT):
-                timg = timg.Factory(timg, tfoot.getBBox(), afwImage.PARENT, True)
+            tbb = tfoot.getBBox()
+            if not tbb.isEmpty() and tbb != timg.getBBox(afwImage.PARENT):
+                timg = timg.Factory(timg, tbb, afwImage.PARENT, True)
             pkres.setTemplate(timg, tfoot)
     return False
 
@@ -1085,22 +1146,33 @@ def _weightTemplates(dp):
     -------
     None
     """
-    nchild = np.sum([pkres.skip is False for pkres in dp.peaks])
-    A = np.zeros((dp.W*dp.H, nchild))
+    nchild = sum(1 for pkres in dp.peaks if not pkres.skip)
+    # Store one template per row, so that each template is copied into a
+    # contiguous block instead of a strided column
+    A = np.empty((nchild, dp.H, dp.W))
     parentImage = afwImage.ImageF(dp.bb)
     afwDet.copyWithinFootprintImage(dp.fp, dp.img, parentImage)
     b = parentImage.getArray().ravel()
 
+    # Reuse a single scratch image for all of the children. Each template has its
+    # own bounding box, so a copy only sets the pixels of the parent footprint
+    # inside that box; clear the previous child's pixels before every copy.
+    childImage = afwImage.ImageF(dp.bb)
+    childArray = childImage.getArray()
     index = 0
     for pkres in dp.peaks:
         if pkres.skip:
             continue
-        childImage = afwImage.ImageF(dp.bb)
+        childArray[:] = 0
         afwDet.copyWithinFootprintImage(dp.fp, pkres.templateImage, childImage)
-        A[:, index] = childImage.getArray().ravel()
+        np.copyto(A[index], childImage.getArray())
         index += 1
+    A = A.reshape(nchild, dp.H*dp.W)
 
-    X1, r1, rank1, s1 = np.linalg.lstsq(A, b, rcond=-1)
+    # Solve the full least-squares problem rather than the normal equations:
+    # degenerate templates have not been removed yet at this stage, and
+    # forming A A^T would square the condition number of nearly parallel templates
+    X1, r1, rank1, s1 = np.linalg.lstsq(A.T, b, rcond=-1)
     del A
     del b
 
@@ -1144,8 +1216,14 @@ def reconstructTemplates(debResult, log, maxTempDotProd=0.5):
     foundReject = False
     for fidx in debResult.filters:
         dp = debResult.deblendedParents[fidx]
-        nchild = np.sum([pkres.skip is False for pkres in dp.peaks])
         indexes = [pkres.pki for pkres in dp.peaks if pkres.skip is False]
+        nchild = len(indexes)
+        # A single template cannot be degenerate with anything, so don't
+        # bother building its HeavyFootprint. foundReject carries over from the
+        # previous filters, and once it is set the rejection below still runs,
+        # so only skip ahead while it is unset.
+        if nchild < 2 and not foundReject:
+            continue
 
         # We build a matrix that stores the dot product between templates.
         # We convert the template images to HeavyFootprints because they already have a method
@@ -1164,14 +1242,14 @@ def reconstructTemplates(debResult, log, maxTempDotProd=0.5):
             for j in range(i + 1):
                 A[i, j] = heavies[i].dot(heavies[j])
 
-        # Normalize the dot products to get the cosine of the angle between templates
-        for i in range(nchild):
-            for j in range(i):
-                norm = A[i, i]*A[j, j]
-                if norm <= 0:
-                    A[i, j] = 0
-                else:
-                    A[i, j] /= np.sqrt(norm)
+        # Normalize the dot products to get the cosine of the angle between templates,
+        # using a single outer product of the template norms for all of the pairs
+        lower = np.tril_indices(nchild, -1)
+        norm = np.outer(A.diagonal(), A.diagonal())[lower]
+        cosine = np.zeros(len(norm))
+        positive = norm > 0
+        cosine[positive] = A[lower][positive]/np.sqrt(norm[positive])
+        A[lower] = cosine
 
         # Iterate over pairs of objects and find the maximum non-diagonal element of the matrix.
         # Exit the loop once we find a single degenerate pair greater than the threshold.
@@ -1205,8 +1283,7 @@ def reconstructTemplates(debResult, log, maxTempDotProd=0.5):
                 if maxTemplate[rejectedIndex] > maxTemplate[i]:
                     keep = indexes[rejectedIndex]
                     reject = indexes[i]
-            log.trace('Removing object with index %d : %f.  Degenerate with %d' % (reject, currentMax,
-                                                                                   keep))
+            log.trace('Removing object with index %d : %f.  Degenerate with %d', reject, currentMax, keep)
             dp.peaks[reject].skip = True
             dp.peaks[reject].degenerate = True
 
@@ -278,15 +278,16 @@ class SourceDeblendTask(pipeBase.Task):
 
         @return None
         """
-        self.log.info("Deblending %d sources" % len(srcs))
+        self.log.info("Deblending %d sources", len(srcs))
 
         from lsst.meas.deblender.baseline import deblend
 
         # find the median stdev in the image...
         mi = exposure.getMaskedImage()
+        mask = mi.getMask()
         statsCtrl = afwMath.StatisticsControl()
-        statsCtrl.setAndMask(mi.getMask().getPlaneBitMask(self.config.maskPlanes))
-        stats = afwMath.makeStatistics(mi.getVariance(), mi.getMask(), afwMath.MEDIAN, statsCtrl)
+        statsCtrl.setAndMask(mask.getPlaneBitMask(self.config.maskPlanes))
+        stats = afwMath.makeStatistics(mi.getVariance(), mask, afwMath.MEDIAN, statsCtrl)
         sigma1 = math.sqrt(stats.getValue(afwMath.MEDIAN))
         self.log.trace('sigma1: %g', sigma1)
 
@@ -307,13 +308,13 @@ class SourceDeblendTask(pipeBase.Task):
 
             if self.isLargeFootprint(fp):
                 src.set(self.tooBigKey, True)
-                self.skipParent(src, mi.getMask())
+                self.skipParent(src, mask)
                 self.log.warn('Parent %i: skipping large footprint (area: %i)',
                               int(src.getId()), int(fp.getArea()))
                 continue
-            if self.isMasked(fp, exposure.getMaskedImage().getMask()):
+            if self.isMasked(fp, mask):
                 src.set(self.maskedKey, True)
-                self.skipParent(src, mi.getMask())
+                self.skipParent(src, mask)
                 self.log.warn('Parent %i: skipping masked footprint (area: %i)',
                               int(src.getId()), int(fp.getArea()))
                 continue
@@ -328,7 +329,7 @@ class SourceDeblendTask(pipeBase.Task):
             npre = len(srcs)
 
             # This should really be set in deblend, but deblend doesn't have access to the src
-            src.set(self.tooManyPeaksKey, len(fp.getPeaks()) > self.config.maxNumberOfPeaks)
+            src.set(self.tooManyPeaksKey, len(pks) > self.config.maxNumberOfPeaks)
 
             try:
                 res = deblend(
@@ -353,7 +354,7 @@ class SourceDeblendTask(pipeBase.Task):
                     src.set(self.deblendFailedKey, False)
             except Exception as e:
                 if self.config.catchFailures:
-                    self.log.warn("Unable to deblend source %d: %s" % (src.getId(), e))
+                    self.log.warn("Unable to deblend source %d: %s", src.getId(), e)
                     src.set(self.deblendFailedKey, True)
                     import traceback
                     traceback.print_exc()
@@ -438,8 +439,8 @@ class SourceDeblendTask(pipeBase.Task):
             # print('Deblending parent id', src.getId(), 'took', time.clock() - t0)
 
         n1 = len(srcs)
-        self.log.info('Deblended: of %i sources, %i were deblended, creating %i children, total %i sources'
-                      % (n0, nparents, n1-n0, n1))
+        self.log.info('Deblended: of %i sources, %i were deblended, creating %i children, total %i sources',
+                      n0, nparents, n1-n0, n1)
 
     def preSingleDeblendHook(self, exposure, srcs, i, fp, psf, psf_fwhm, sigma1):
         pass
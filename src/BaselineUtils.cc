@@ -1256,35 +1256,41 @@ buildSymmetricTemplate(
     afwGeom::SpanSet::const_iterator back = spans.end()-1;
 
     ImagePtrT theimg = img.getImage();
+    int const ix0 = theimg->getX0();
+    int const iy0 = theimg->getY0();
+    int const tx0 = targetimg->getX0();
+    int const ty0 = targetimg->getY0();
 
     for (; fwd <= back; fwd++, back--) {
         int fy = fwd->getY();
         int by = back->getY();
-
-        for (int fx=fwd->getX0(), bx=back->getX1();
-             fx <= fwd->getX1();
-             fx++, bx--) {
+        int fx0 = fwd->getX0();
+        int bx1 = back->getX1();
+        int npix = fwd->getX1() - fx0 + 1;
+
+        // The symmetric spans have the same length, so walk the forward
+        // span left-to-right and its mirror right-to-left with row
+        // iterators rather than looking up each pixel by its position.
+        // We have already checked the bounding box, so all of these
+        // pixels are inside both images.
+        typename ImageT::x_iterator fin = theimg->x_at(fx0 - ix0, fy - iy0);
+        typename ImageT::x_iterator bin = theimg->x_at(bx1 - ix0, by - iy0);
+        typename ImageT::x_iterator fout = targetimg->x_at(fx0 - tx0, fy - ty0);
+        typename ImageT::x_iterator bout = targetimg->x_at(bx1 - tx0, by - ty0);
+
+        for (int i = 0; i < npix; ++i) {
             // FIXME -- CURRENTLY WE IGNORE THE MASK PLANE!  options
             // include ORing the mask bits, or being clever about
             // ignoring some masked pixels, or copying the mask bits
             // of the min pixel
-
-            // We have already checked the bounding box, so this should always be satisfied
-            assert(theimg->getBBox(image::PARENT).contains(geom::Point2I(fx, fy)));
-            assert(theimg->getBBox(image::PARENT).contains(geom::Point2I(bx, by)));
-
-            // FIXME -- we could do this with image iterators instead.
-            // But first profile to show that it's necessary and an
-            // improvement.
-            ImagePixelT pixf = (*theimg)[geom::Point2I(fx, fy)];
-            ImagePixelT pixb = (*theimg)[geom::Point2I(bx, by)];
+            ImagePixelT pixf = static_cast<ImagePixelT>(fin[i]);
+            ImagePixelT pixb = static_cast<ImagePixelT>(bin[-i]);
             ImagePixelT pix = std::min(pixf, pixb);
             if (minZero) {
                 pix = std::max(pix, static_cast<ImagePixelT>(0));
             }
-            (*targetimg)[geom::Point2I(fx, fy)] = pix;
-            (*targetimg)[geom::Point2I(bx, by)] = pix;
-
+            fout[i] = pix;
+            bout[-i] = pix;
         }
     }
 
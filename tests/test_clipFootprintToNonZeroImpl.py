@@ -57,6 +57,30 @@ class ClipFootprintTestCase(lsst.utils.tests.TestCase):
 
         self.assertEqual(foot.spans, span1)
 
+    def testClipToImage(self):
+        '''Spans that extend outside the image are clipped to it'''
+        bbox = geom.Box2I(geom.Point2I(0, 0), geom.Extent2I(10, 10))
+        im = afwImage.ImageI(bbox)
+        im.set(1)
+
+        foot = afwDet.Footprint(afwGeom.SpanSet(geom.Box2I(geom.Point2I(-3, -3), geom.Point2I(12, 12))))
+
+        clipFootprintToNonzeroImpl(foot, im)
+
+        self.assertEqual(foot.spans, afwGeom.SpanSet(bbox))
+
+    def testDropZeroSpans(self):
+        '''Spans that are entirely zero are dropped'''
+        im = afwImage.ImageI(geom.Box2I(geom.Point2I(0, 0), geom.Extent2I(10, 10)))
+        im.set(1)
+        im.getArray()[3:5, :] = 0
+
+        foot = afwDet.Footprint(afwGeom.SpanSet(geom.Box2I(geom.Point2I(2, 2), geom.Point2I(7, 7))))
+
+        clipFootprintToNonzeroImpl(foot, im)
+
+        self.assertEqual(foot.spans, afwGeom.SpanSet([afwGeom.Span(y, 2, 7) for y in (2, 5, 6, 7)]))
+
 
 class TestMemory(lsst.utils.tests.MemoryTestCase):
     pass
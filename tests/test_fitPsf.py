@@ -21,6 +21,8 @@
 # see <https://www.lsstcorp.org/LegalNotices/>.
 #
 import unittest
+from unittest import mock
+import types
 import numpy as np
 
 import lsst.utils.tests
@@ -168,6 +170,46 @@ class FitPsfTestCase(unittest.TestCase):
                 continue
             print('  ', k, getattr(pkres, k))
 
+    def testDebugUnshiftedModel(self):
+        """Save the debug PSF models when the unshifted PSF model is kept"""
+        spans = afwGeom.SpanSet.fromShape(30, offset=(50, 50))
+        fp = afwDet.Footprint(spans)
+        fbb = fp.getBBox()
+        fmask = afwImage.Mask(fbb)
+        fp.spans.setMask(fmask, 1)
+
+        psfsig = 1.5
+        psffwhm = psfsig * 2.35
+        cpsf = CachingPsf(measAlg.DoubleGaussianPsf(11, 11, psfsig))
+
+        # An extended source that is not fit well by the PSF, so the
+        # (arbitrary) unshifted model is kept
+        img = afwImage.ImageF(fbb)
+        yy, xx = np.mgrid[fbb.getMinY():fbb.getMaxY()+1, fbb.getMinX():fbb.getMaxX()+1]
+        img.getArray()[:] = 1000.*np.exp(-((xx - 50)**2 + (yy - 50)**2)/(2*6.**2))
+        varimg = afwImage.ImageF(fbb)
+        varimg.set(1.)
+
+        peaks = afwDet.PeakCatalog(afwDet.PeakTable.makeMinimalSchema())
+        pk = peaks.addNew()
+        pk.setFx(50.)
+        pk.setFy(50.)
+        pk.setIx(50)
+        pk.setIy(50)
+        pkres = DeblendedPeak(pk, 0, None)
+        log = Log.getLogger('tests.fit_psf')
+
+        debugInfo = types.SimpleNamespace(plots=False, psf=True)
+        with mock.patch('lsstDebug.Info', return_value=debugInfo):
+            _fitPsf(fp, fmask, pk, pk.getF(), pkres, fbb, peaks, [pk.getF()], log, cpsf, psffwhm,
+                    img, varimg, 1.5, 1.5, 1.5)
+
+        self.assertFalse(pkres.psfFitWithDecenter)
+        self.assertIsNotNone(pkres.psfFitDebugPsfModel)
+        # Without the derivative terms the PSF derivative model is just the PSF model
+        np.testing.assert_allclose(pkres.psfFitDebugPsfDerivImg.getArray(),
+                                   pkres.psfFitDebugPsfImg.getArray())
+
 
 class TestMemory(lsst.utils.tests.MemoryTestCase):
     pass
@@ -0,0 +1,123 @@
+#
+# LSST Data Management System
+#
+# Copyright 2008-2018  AURA/LSST.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsst.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <https://www.lsstcorp.org/LegalNotices/>.
+#
+import unittest
+import numpy as np
+
+import lsst.utils.tests
+import lsst.afw.detection as afwDet
+import lsst.geom as geom
+import lsst.afw.geom as afwGeom
+import lsst.afw.image as afwImage
+from lsst.log import Log
+import lsst.meas.algorithms as measAlg
+from lsst.meas.deblender.baseline import DeblenderResult
+from lsst.meas.deblender.plugins import _weightTemplates
+
+
+class WeightTemplatesTestCase(lsst.utils.tests.TestCase):
+    '''
+    Test that the template weights match the least-squares solution for
+    templates padded out to the parent bounding box.
+    '''
+    def setUp(self):
+        np.random.seed(42)
+        self.bbox = geom.Box2I(geom.Point2I(0, 0), geom.Extent2I(40, 30))
+        self.maskedImage = afwImage.MaskedImageF(self.bbox)
+        self.maskedImage.getVariance().set(1.)
+
+        foot = afwDet.Footprint(afwGeom.SpanSet(self.bbox))
+        foot.addPeak(10, 15, 1.)
+        foot.addPeak(30, 15, 1.)
+        psf = measAlg.DoubleGaussianPsf(11, 11, 1.5)
+        log = Log.getLogger('tests.weight_templates')
+        self.debResult = DeblenderResult(foot, self.maskedImage, psf, 1.5*2.35, log, avgNoise=1.)
+        self.dp = self.debResult.deblendedParents[0]
+
+    def tearDown(self):
+        del self.maskedImage
+        del self.debResult
+        del self.dp
+
+    def makeTemplate(self, bbox):
+        template = afwImage.ImageF(bbox)
+        template.getArray()[:] = np.random.uniform(1., 2., size=template.getArray().shape)
+        return template
+
+    def padTemplate(self, template):
+        '''Copy ``template`` into a zero array covering the parent bounding box'''
+        padded = np.zeros((self.bbox.getHeight(), self.bbox.getWidth()))
+        tbb = template.getBBox()
+        padded[tbb.getMinY() - self.bbox.getMinY(): tbb.getMaxY() + 1 - self.bbox.getMinY(),
+               tbb.getMinX() - self.bbox.getMinX(): tbb.getMaxX() + 1 - self.bbox.getMinX()] = \
+            template.getArray()
+        return padded
+
+    def checkWeights(self, templates):
+        '''Set the templates, weight them, and compare to a direct least-squares fit'''
+        padded = [self.padTemplate(template) for template in templates]
+        for pkres, template in zip(self.dp.peaks, templates):
+            pkres.setTemplate(template, afwDet.Footprint(afwGeom.SpanSet(template.getBBox())))
+
+        A = np.array([p.ravel() for p in padded]).T
+        b = self.maskedImage.getImage().getArray().ravel()
+        expected = np.linalg.lstsq(A, b, rcond=-1)[0]
+
+        _weightTemplates(self.dp)
+        weights = np.array([pkres.templateWeight for pkres in self.dp.peaks])
+        self.assertFloatsAlmostEqual(weights, expected, rtol=1e-8)
+        return weights
+
+    def testNearDuplicateTemplates(self):
+        '''Nearly parallel templates must still get the least-squares weights'''
+        t1 = self.makeTemplate(self.bbox)
+        t2 = afwImage.ImageF(t1, True)
+        t2.getArray()[:] += 1e-4*np.random.normal(size=t2.getArray().shape)
+        img = self.maskedImage.getImage().getArray()
+        img[:] = 2*t1.getArray() + 3*t2.getArray() + 1e-3*np.random.normal(size=img.shape)
+        self.checkWeights([t1, t2])
+
+    def testDifferentBBoxes(self):
+        '''Templates with different bounding boxes must not leak into each other
+
+        If pixels of the first template were left in the second template's row
+        of the fit, the weights would not recover the true values.
+        '''
+        t1 = self.makeTemplate(geom.Box2I(geom.Point2I(0, 0), geom.Extent2I(25, 30)))
+        t2 = self.makeTemplate(geom.Box2I(geom.Point2I(15, 5), geom.Extent2I(25, 20)))
+        img = self.maskedImage.getImage().getArray()
+        img[:] = 2*self.padTemplate(t1) + 3*self.padTemplate(t2)
+        weights = self.checkWeights([t1, t2])
+        self.assertFloatsAlmostEqual(weights, np.array([2., 3.]), rtol=1e-5)
+
+
+class TestMemory(lsst.utils.tests.MemoryTestCase):
+    pass
+
+
+def setup_module(module):
+    lsst.utils.tests.init()
+
+
+if __name__ == "__main__":
+    lsst.utils.tests.init()
+    unittest.main()